@@ -3,43 +3,95 @@ Region, InstanceType
 '''
 import boto3
 import csv
+import functools
+import os
+import queue
+import threading
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List, Dict
 
+# Shared client config: a pool large enough for the thread fan-out, TCP
+# keepalive, and adaptive retries so throttled calls back off instead of failing.
+_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 10}
+)
+
+@functools.cache
 def get_all_regions() -> List[str]:
-    """Get list of all AWS regions."""
-    ec2_client = boto3.client('ec2')
-    regions = [region['RegionName'] 
+    """Get list of all AWS regions (memoized; the answer rarely changes)."""
+    ec2_client = boto3.client('ec2', config=_CONFIG)
+    regions = [region['RegionName']
               for region in ec2_client.describe_regions()['Regions']]
     return regions
 
-def get_instance_types(region: str) -> List[str]:
+def get_instance_types(session: boto3.Session, region: str) -> List[str]:
     try:
-        ec2_client = boto3.client('ec2', region_name=region)
+        print(f"Processing region: {region}")
+        ec2_client = session.client('ec2', region_name=region, config=_CONFIG)
         paginator = ec2_client.get_paginator('describe_instance_type_offerings')
-        instance_types = set()  
-        
-        for page in paginator.paginate(LocationType='region'):
-            for offering in page['InstanceTypeOfferings']:
-                instance_types.add(offering['InstanceType'])
-                
-        return sorted(list(instance_types))
+
+        # Filter to the region server-side so each page carries exactly one
+        # offering per type; PageSize=1000 (the API maximum) cuts page count
+        return sorted({offering['InstanceType']
+                       for page in paginator.paginate(
+                           LocationType='region',
+                           Filters=[{'Name': 'location', 'Values': [region]}],
+                           PaginationConfig={'PageSize': 1000})
+                       for offering in page['InstanceTypeOfferings']})
+    except ClientError as e:
+        # By the time a ClientError surfaces here the adaptive retries are
+        # exhausted; name the error code so throttling under the process
+        # fan-out isn't mistaken for a region with no offerings
+        error_code = e.response['Error']['Code']
+        print(f"Error getting instance types for region {region} ({error_code}): {str(e)}")
+        return []
     except Exception as e:
         print(f"Error getting instance types for region {region}: {str(e)}")
         return []
 
+def _fetch_region_offerings(region: str) -> List[str]:
+    """Process-pool worker; boto3 sessions aren't fork-safe, so each child builds its own."""
+    return get_instance_types(boto3.Session(), region)
+
 def main():
     regions = get_all_regions()
-    
-    with open('ec2_instance_types.csv', 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(['Region', 'InstanceType'])
-        
-        for region in regions:
-            print(f"Processing region: {region}")
-            instance_types = get_instance_types(region)
-            
-            for instance_type in instance_types:
-                writer.writerow([region, instance_type])
+
+    # Rows stream through a bounded queue to a single writer thread, so memory
+    # stays constant and CSV writing overlaps the remaining fetches
+    # (csv.writer is not thread-safe, so only the writer thread touches it).
+    row_queue = queue.Queue(maxsize=1000)
+
+    def write_rows():
+        with open('ec2_instance_types.csv', 'w', newline='', buffering=1 << 20) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Region', 'InstanceType'])
+
+            while True:
+                row = row_queue.get()
+                if row is None:
+                    break
+                writer.writerow(row)
+
+    writer_thread = threading.Thread(target=write_rows)
+    writer_thread.start()
+
+    # Worker processes decode botocore's JSON responses in parallel without
+    # contending on this process's GIL; each region's rows are enqueued here
+    # as its future completes.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {executor.submit(_fetch_region_offerings, region): region
+                   for region in regions}
+        for future in as_completed(futures):
+            region = futures[future]
+            for instance_type in future.result():
+                row_queue.put((region, instance_type))
+
+    row_queue.put(None)  # sentinel: every region has been fetched
+    writer_thread.join()
 
 if __name__ == "__main__":
     main()
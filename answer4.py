@@ -1,88 +1,110 @@
 import boto3
 import csv
+import functools
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from datetime import datetime
+from botocore.config import Config
+
+_SESSION = boto3.Session()
+_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 10}
+)
+
+@functools.cache
+def _client(service: str, region: str = None):
+    """Return a cached boto3 client for (service, region) on the shared session."""
+    return _SESSION.client(service, region_name=region, config=_CONFIG)
 
 class AWSSecurityAuditor:
     def __init__(self):
-        self.iam = boto3.client('iam')
-        self.ec2 = boto3.client('ec2')
+        self.iam = _client('iam')
+        self.ec2 = _client('ec2')
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
     def check_iam_roles_permissions(self) -> None:
         """Check IAM roles for overly permissive permissions."""
         try:
-            with open(f'iam_roles_audit_{self.timestamp}.csv', 'w', newline='') as csvfile:
+            # get_account_authorization_details returns every role, its inline
+            # policy documents, and every managed policy document in one
+            # paginated call, replacing the per-role/per-policy API fan-out.
+            roles = []
+            managed_documents = {}
+            paginator = self.iam.get_paginator('get_account_authorization_details')
+            for page in paginator.paginate(
+                Filter=['Role', 'LocalManagedPolicy', 'AWSManagedPolicy']
+            ):
+                roles.extend(page['RoleDetailList'])
+                for policy in page['Policies']:
+                    document = next((version['Document']
+                                     for version in policy['PolicyVersionList']
+                                     if version['IsDefaultVersion']), None)
+                    if document is not None:
+                        managed_documents[policy['Arn']] = document
+
+            rows = []
+            for role in roles:
+                for attached in role['AttachedManagedPolicies']:
+                    document = managed_documents.get(attached['PolicyArn'])
+                    if document is not None and self._is_overly_permissive_document(document):
+                        rows.append([role['RoleName'], attached['PolicyName']])
+
+                for inline in role['RolePolicyList']:
+                    if self._is_overly_permissive_document(inline['PolicyDocument']):
+                        rows.append([role['RoleName'], inline['PolicyName']])
+
+            with open(f'iam_roles_audit_{self.timestamp}.csv', 'w', newline='',
+                      buffering=1 << 20) as csvfile:
                 writer = csv.writer(csvfile)
                 writer.writerow(['IAMRoleName', 'PolicyName'])
-                
-                paginator = self.iam.get_paginator('list_roles')
-                for page in paginator.paginate():
-                    for role in page['Roles']:
-                        role_name = role['RoleName']
-                        
-                        # Check attached managed policies
-                        attached_policies = self.iam.list_attached_role_policies(RoleName=role_name)
-                        for policy in attached_policies['AttachedPolicies']:
-                            if self._is_overly_permissive_policy(policy['PolicyArn']):
-                                writer.writerow([role_name, policy['PolicyName']])
-                        
-                        # Check inline policies
-                        inline_policies = self.iam.list_role_policies(RoleName=role_name)
-                        for policy_name in inline_policies['PolicyNames']:
-                            policy = self.iam.get_role_policy(
-                                RoleName=role_name,
-                                PolicyName=policy_name
-                            )
-                            if self._is_overly_permissive_inline_policy(policy):
-                                writer.writerow([role_name, policy_name])
-                                
+                writer.writerows(rows)
+
             print(f"IAM roles audit completed. Results saved to iam_roles_audit_{self.timestamp}.csv")
         except Exception as e:
             print(f"Error checking IAM roles: {str(e)}")
 
-    def _is_overly_permissive_policy(self, policy_arn: str) -> bool:
-        """Check if a managed policy is overly permissive."""
-        try:
-            policy = self.iam.get_policy(PolicyArn=policy_arn)
-            policy_version = self.iam.get_policy_version(
-                PolicyArn=policy_arn,
-                VersionId=policy['Policy']['DefaultVersionId']
-            )
-            
-            # Check for AdministratorAccess or similar overly permissive policies
-            for statement in policy_version['PolicyVersion']['Document']['Statement']:
-                if (statement.get('Effect') == 'Allow' and 
-                    statement.get('Action') == '*' and 
-                    statement.get('Resource') == '*'):
-                    return True
-            return False
-        except Exception:
-            return False
-
-    def _is_overly_permissive_inline_policy(self, policy: Dict) -> bool:
-        """Check if an inline policy is overly permissive."""
-        for statement in policy['PolicyDocument']['Statement']:
-            if (statement.get('Effect') == 'Allow' and 
-                statement.get('Action') == '*' and 
-                statement.get('Resource') == '*'):
-                return True
-        return False
+    @staticmethod
+    def _is_overly_permissive_document(document: Dict) -> bool:
+        """Check a policy document for an Allow of every action on every resource."""
+        def is_wildcard(statement: Dict) -> bool:
+            action = statement.get('Action')
+            resource = statement.get('Resource')
+            return (statement.get('Effect') == 'Allow' and
+                    (action == '*' or (isinstance(action, list) and '*' in action)) and
+                    (resource == '*' or (isinstance(resource, list) and '*' in resource)))
+
+        # The IAM JSON grammar allows Statement to be a single dict as well as a list
+        statements = document['Statement']
+        if not isinstance(statements, list):
+            statements = [statements]
+
+        return any(is_wildcard(statement) for statement in statements)
 
     def check_mfa_status(self) -> None:
         """Check MFA status for all IAM users."""
         try:
-            with open(f'mfa_status_{self.timestamp}.csv', 'w', newline='') as csvfile:
+            # The credential report covers the whole account in two calls,
+            # replacing one list_mfa_devices round-trip per user
+            while self.iam.generate_credential_report()['State'] != 'COMPLETE':
+                time.sleep(1)
+
+            report = self.iam.get_credential_report()['Content'].decode()
+
+            rows = [[row['user'], row['mfa_active'] == 'true']
+                    for row in csv.DictReader(io.StringIO(report))
+                    if row['user'] != '<root_account>']
+
+            with open(f'mfa_status_{self.timestamp}.csv', 'w', newline='',
+                      buffering=1 << 20) as csvfile:
                 writer = csv.writer(csvfile)
                 writer.writerow(['IAMUserName', 'MFAEnabled'])
-                
-                paginator = self.iam.get_paginator('list_users')
-                for page in paginator.paginate():
-                    for user in page['Users']:
-                        mfa_devices = self.iam.list_mfa_devices(UserName=user['UserName'])
-                        mfa_enabled = len(mfa_devices['MFADevices']) > 0
-                        writer.writerow([user['UserName'], mfa_enabled])
-                        
+                writer.writerows(rows)
+
+
             print(f"MFA status check completed. Results saved to mfa_status_{self.timestamp}.csv")
         except Exception as e:
             print(f"Error checking MFA status: {str(e)}")
@@ -90,23 +112,28 @@ class AWSSecurityAuditor:
     def check_security_groups(self) -> None:
         """Check security groups for public access."""
         try:
-            with open(f'security_groups_audit_{self.timestamp}.csv', 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['SGName', 'Port', 'AllowedIP'])
-                
-                security_groups = self.ec2.describe_security_groups()
-                sensitive_ports = [22, 80, 443, 3306, 1433, 5432]  # SSH, HTTP, HTTPS, MySQL, MSSQL, PostgreSQL
-                
-                for sg in security_groups['SecurityGroups']:
+            sensitive_ports = [22, 80, 443, 3306, 1433, 5432]  # SSH, HTTP, HTTPS, MySQL, MSSQL, PostgreSQL
+
+            rows = []
+            # Paginate so accounts with >1000 security groups aren't silently truncated
+            paginator = self.ec2.get_paginator('describe_security_groups')
+            for page in paginator.paginate(PaginationConfig={'PageSize': 1000}):
+                for sg in page['SecurityGroups']:
                     for rule in sg['IpPermissions']:
                         # Check if port is in sensitive list
                         from_port = rule.get('FromPort', 0)
                         to_port = rule.get('ToPort', 0)
-                        
+
                         for ip_range in rule.get('IpRanges', []):
                             cidr = ip_range.get('CidrIp', '')
                             if cidr == '0.0.0.0/0' and (from_port in sensitive_ports or to_port in sensitive_ports):
-                                writer.writerow([sg['GroupName'], f"{from_port}-{to_port}", cidr])
+                                rows.append([sg['GroupName'], f"{from_port}-{to_port}", cidr])
+
+            with open(f'security_groups_audit_{self.timestamp}.csv', 'w', newline='',
+                      buffering=1 << 20) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(['SGName', 'Port', 'AllowedIP'])
+                writer.writerows(rows)
                                 
             print(f"Security groups audit completed. Results saved to security_groups_audit_{self.timestamp}.csv")
         except Exception as e:
@@ -117,21 +144,22 @@ class AWSSecurityAuditor:
         try:
             key_pairs = {key['KeyName']: False for key in self.ec2.describe_key_pairs()['KeyPairs']}
             
-            # Check which key pairs are in use
-            instances = self.ec2.describe_instances()
-            for reservation in instances['Reservations']:
-                for instance in reservation['Instances']:
-                    if 'KeyName' in instance:
-                        key_pairs[instance['KeyName']] = True
+            # Check which key pairs are in use (paginated to cover large fleets)
+            paginator = self.ec2.get_paginator('describe_instances')
+            for page in paginator.paginate(PaginationConfig={'PageSize': 1000}):
+                for reservation in page['Reservations']:
+                    for instance in reservation['Instances']:
+                        if 'KeyName' in instance:
+                            key_pairs[instance['KeyName']] = True
             
             # Write unused key pairs to CSV
-            with open(f'unused_key_pairs_{self.timestamp}.csv', 'w', newline='') as csvfile:
+            with open(f'unused_key_pairs_{self.timestamp}.csv', 'w', newline='',
+                      buffering=1 << 20) as csvfile:
                 writer = csv.writer(csvfile)
                 writer.writerow(['KeyPairName', 'InUse'])
-                
-                for key_name, in_use in key_pairs.items():
-                    writer.writerow([key_name, in_use])
-                    
+                writer.writerows(key_pairs.items())
+
+
             print(f"Key pairs audit completed. Results saved to unused_key_pairs_{self.timestamp}.csv")
         except Exception as e:
             print(f"Error checking key pairs: {str(e)}")
@@ -141,19 +169,19 @@ def main():
     
     print("Starting AWS Security Audit...")
     print("=" * 50)
-    
-    print("\nChecking IAM roles permissions...")
-    auditor.check_iam_roles_permissions()
-    
-    print("\nChecking MFA status...")
-    auditor.check_mfa_status()
-    
-    print("\nChecking security groups...")
-    auditor.check_security_groups()
-    
-    print("\nChecking unused key pairs...")
-    auditor.check_unused_key_pairs()
-    
+
+    checks = [
+        auditor.check_iam_roles_permissions,
+        auditor.check_mfa_status,
+        auditor.check_security_groups,
+        auditor.check_unused_key_pairs,
+    ]
+
+    # Each check writes its own CSV and handles its own errors, so the four
+    # of them can run side by side (they also hit independent services)
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        list(executor.map(lambda check: check(), checks))
+
     print("\nAudit complete. Please check the CSV files for detailed results.")
 
 if __name__ == "__main__":
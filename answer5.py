@@ -1,51 +1,121 @@
 import boto3
+import functools
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
-import statistics
+from botocore.config import Config
+
+_SESSION = boto3.Session()
+_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 10}
+)
+
+@functools.cache
+def _client(service: str, region: str = None):
+    """Return a cached boto3 client for (service, region) on the shared session."""
+    return _SESSION.client(service, region_name=region, config=_CONFIG)
+
+# get_metric_data accepts at most 500 queries per call
+METRIC_BATCH_SIZE = 500
 
 class AWSResourceOptimizer:
     def __init__(self):
-        self.ec2 = boto3.client('ec2')
-        self.rds = boto3.client('rds')
-        self.cloudwatch = boto3.client('cloudwatch')
-        self.lambda_client = boto3.client('lambda')
-        self.s3 = boto3.client('s3')
-        
+        self.ec2 = _client('ec2')
+        self.rds = _client('rds')
+        self.cloudwatch = _client('cloudwatch')
+        self.lambda_client = _client('lambda')
+        self.s3 = _client('s3')
+
+    @staticmethod
+    def _metric_query(query_id: str, namespace: str, metric_name: str,
+                      dimensions: List[Dict[str, str]], period: int, stat: str) -> Dict[str, Any]:
+        """Build a single MetricDataQuery entry for get_metric_data."""
+        return {
+            'Id': query_id,
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': namespace,
+                    'MetricName': metric_name,
+                    'Dimensions': dimensions
+                },
+                'Period': period,
+                'Stat': stat
+            }
+        }
+
+    def _get_metric_values(self, queries: List[Dict[str, Any]],
+                           start_time: datetime, end_time: datetime) -> Dict[str, List[float]]:
+        """Fetch all queries in batches of 500 and return values keyed by query id."""
+        values = {}
+        paginator = self.cloudwatch.get_paginator('get_metric_data')
+
+        for start in range(0, len(queries), METRIC_BATCH_SIZE):
+            batch = queries[start:start + METRIC_BATCH_SIZE]
+            for page in paginator.paginate(
+                MetricDataQueries=batch,
+                StartTime=start_time,
+                EndTime=end_time
+            ):
+                for result in page['MetricDataResults']:
+                    values.setdefault(result['Id'], []).extend(result['Values'])
+
+        return values
+
     def get_ec2_low_utilization(self, cpu_threshold: float = 10.0, days: int = 30) -> List[Dict[str, Any]]:
         """Identify EC2 instances with low CPU utilization."""
         try:
             low_utilization_instances = []
-            instances = self.ec2.describe_instances()
-            
+
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(days=days)
-            
-            for reservation in instances['Reservations']:
-                for instance in reservation['Instances']:
-                    if instance['State']['Name'] != 'running':
-                        continue
-                        
-                    response = self.cloudwatch.get_metric_statistics(
-                        Namespace='AWS/EC2',
-                        MetricName='CPUUtilization',
-                        Dimensions=[{'Name': 'InstanceId', 'Value': instance['InstanceId']}],
-                        StartTime=start_time,
-                        EndTime=end_time,
-                        Period=3600,  # 1-hour periods
-                        Statistics=['Average']
-                    )
-                    
-                    if response['Datapoints']:
-                        avg_cpu = statistics.mean([point['Average'] for point in response['Datapoints']])
-                        if avg_cpu < cpu_threshold:
-                            low_utilization_instances.append({
-                                'InstanceId': instance['InstanceId'],
-                                'InstanceType': instance['InstanceType'],
-                                'AverageCPU': round(avg_cpu, 2),
-                                'Name': next((tag['Value'] for tag in instance.get('Tags', []) 
-                                           if tag['Key'] == 'Name'), 'No Name')
-                            })
-                            
+
+            # Paginate so fleets beyond the default page size aren't silently truncated
+            paginator = self.ec2.get_paginator('describe_instances')
+            running = [instance
+                       for page in paginator.paginate(PaginationConfig={'PageSize': 1000})
+                       for reservation in page['Reservations']
+                       for instance in reservation['Instances']
+                       if instance['State']['Name'] == 'running']
+
+            # One batched get_metric_data call per 500 instances instead of
+            # one get_metric_statistics round-trip per instance
+            queries = [
+                self._metric_query(
+                    f'm{i}', 'AWS/EC2', 'CPUUtilization',
+                    [{'Name': 'InstanceId', 'Value': instance['InstanceId']}],
+                    3600,  # 1-hour periods
+                    'Average'
+                )
+                for i, instance in enumerate(running)
+            ]
+            metric_values = self._get_metric_values(queries, start_time, end_time)
+
+            measured = [(instance, metric_values[f'm{i}'])
+                        for i, instance in enumerate(running)
+                        if metric_values.get(f'm{i}')]
+
+            if measured:
+                # Reduce all series in one vectorized pass; rows are NaN-padded
+                # since instances can report different numbers of datapoints.
+                # float32 is plenty of precision for a CPU percentage.
+                n_points = max(len(values) for _, values in measured)
+                samples = np.full((len(measured), n_points), np.nan, dtype=np.float32)
+                for row, (_, values) in enumerate(measured):
+                    samples[row, :len(values)] = values
+
+                for (instance, _), avg_cpu in zip(measured, np.nanmean(samples, axis=1)):
+                    if avg_cpu < cpu_threshold:
+                        low_utilization_instances.append({
+                            'InstanceId': instance['InstanceId'],
+                            'InstanceType': instance['InstanceType'],
+                            'AverageCPU': round(float(avg_cpu), 2),
+                            'Name': next((tag['Value'] for tag in instance.get('Tags', [])
+                                       if tag['Key'] == 'Name'), 'No Name')
+                        })
+
             return low_utilization_instances
         except Exception as e:
             print(f"Error checking EC2 utilization: {str(e)}")
@@ -60,28 +130,29 @@ class AWSResourceOptimizer:
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(days=days)
             
-            for instance in instances['DBInstances']:
-                response = self.cloudwatch.get_metric_statistics(
-                    Namespace='AWS/RDS',
-                    MetricName='DatabaseConnections',
-                    Dimensions=[{'Name': 'DBInstanceIdentifier', 
-                               'Value': instance['DBInstanceIdentifier']}],
-                    StartTime=start_time,
-                    EndTime=end_time,
-                    Period=3600,
-                    Statistics=['Maximum']
+            db_instances = instances['DBInstances']
+            queries = [
+                self._metric_query(
+                    f'm{i}', 'AWS/RDS', 'DatabaseConnections',
+                    [{'Name': 'DBInstanceIdentifier',
+                      'Value': instance['DBInstanceIdentifier']}],
+                    3600,
+                    'Maximum'
                 )
-                
-                if response['Datapoints']:
-                    max_connections = max([point['Maximum'] for point in response['Datapoints']])
-                    if max_connections == 0:
-                        idle_instances.append({
-                            'DBInstanceIdentifier': instance['DBInstanceIdentifier'],
-                            'Engine': instance['Engine'],
-                            'InstanceClass': instance['DBInstanceClass'],
-                            'Status': instance['DBInstanceStatus']
-                        })
-                        
+                for i, instance in enumerate(db_instances)
+            ]
+            metric_values = self._get_metric_values(queries, start_time, end_time)
+
+            for i, instance in enumerate(db_instances):
+                values = metric_values.get(f'm{i}', [])
+                if values and max(values) == 0:
+                    idle_instances.append({
+                        'DBInstanceIdentifier': instance['DBInstanceIdentifier'],
+                        'Engine': instance['Engine'],
+                        'InstanceClass': instance['DBInstanceClass'],
+                        'Status': instance['DBInstanceStatus']
+                    })
+
             return idle_instances
         except Exception as e:
             print(f"Error checking RDS utilization: {str(e)}")
@@ -96,26 +167,31 @@ class AWSResourceOptimizer:
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(days=days)
             
-            for page in paginator.paginate():
-                for function in page['Functions']:
-                    response = self.cloudwatch.get_metric_statistics(
-                        Namespace='AWS/Lambda',
-                        MetricName='Invocations',
-                        Dimensions=[{'Name': 'FunctionName', 
-                                   'Value': function['FunctionName']}],
-                        StartTime=start_time,
-                        EndTime=end_time,
-                        Period=days * 24 * 3600,
-                        Statistics=['Sum']
-                    )
-                    
-                    if not response['Datapoints'] or response['Datapoints'][0]['Sum'] == 0:
-                        unused_functions.append({
-                            'FunctionName': function['FunctionName'],
-                            'Runtime': function['Runtime'],
-                            'LastModified': function['LastModified']
-                        })
-                        
+            functions = [function
+                         for page in paginator.paginate()
+                         for function in page['Functions']]
+
+            queries = [
+                self._metric_query(
+                    f'm{i}', 'AWS/Lambda', 'Invocations',
+                    [{'Name': 'FunctionName',
+                      'Value': function['FunctionName']}],
+                    days * 24 * 3600,
+                    'Sum'
+                )
+                for i, function in enumerate(functions)
+            ]
+            metric_values = self._get_metric_values(queries, start_time, end_time)
+
+            for i, function in enumerate(functions):
+                values = metric_values.get(f'm{i}', [])
+                if not values or sum(values) == 0:
+                    unused_functions.append({
+                        'FunctionName': function['FunctionName'],
+                        'Runtime': function['Runtime'],
+                        'LastModified': function['LastModified']
+                    })
+
             return unused_functions
         except Exception as e:
             print(f"Error checking Lambda utilization: {str(e)}")
@@ -125,44 +201,58 @@ class AWSResourceOptimizer:
         """Identify unused S3 buckets."""
         try:
             unused_buckets = []
-            buckets = self.s3.list_buckets()['XXXXXXX']
-            
-            for bucket in buckets:
+            buckets = self.s3.list_buckets()['Buckets']
+
+            end_time = datetime.utcnow()
+            start_time = end_time - timedelta(days=days)
+
+            def probe_bucket(bucket):
+                """Return True if the bucket is empty, None if the probe failed."""
                 try:
                     objects = self.s3.list_objects_v2(
                         Bucket=bucket['Name'],
                         MaxKeys=1
                     )
-                    
-                    if 'Contents' not in objects:
-                        unused_buckets.append({
-                            'BucketName': bucket['Name'],
-                            'CreationDate': bucket['CreationDate'],
-                            'Reason': 'Empty bucket'
-                        })
-                        continue
-                    
-                    metrics = self.cloudwatch.get_metric_statistics(
-                        Namespace='AWS/S3',
-                        MetricName='NumberOfObjects',
-                        Dimensions=[{'Name': 'BucketName', 'Value': bucket['Name']}],
-                        StartTime=datetime.utcnow() - timedelta(days=days),
-                        EndTime=datetime.utcnow(),
-                        Period=days * 24 * 3600,
-                        Statistics=['Average']
-                    )
-                    
-                    if not metrics['Datapoints']:
-                        unused_buckets.append({
-                            'BucketName': bucket['Name'],
-                            'CreationDate': bucket['CreationDate'],
-                            'Reason': 'No recent access'
-                        })
-                        
+                    return 'Contents' not in objects
                 except Exception as e:
                     print(f"Error checking bucket {bucket['Name']}: {str(e)}")
-                    continue
-                    
+                    return None
+
+            # S3 scales per-bucket, so the emptiness probes can run wide
+            with ThreadPoolExecutor(max_workers=32) as executor:
+                empty_flags = list(executor.map(probe_bucket, buckets))
+
+            non_empty_buckets = []
+            for bucket, is_empty in zip(buckets, empty_flags):
+                if is_empty:
+                    unused_buckets.append({
+                        'BucketName': bucket['Name'],
+                        'CreationDate': bucket['CreationDate'],
+                        'Reason': 'Empty bucket'
+                    })
+                elif is_empty is not None:
+                    non_empty_buckets.append(bucket)
+
+            # One batched metric call for all non-empty buckets
+            queries = [
+                self._metric_query(
+                    f'm{i}', 'AWS/S3', 'NumberOfObjects',
+                    [{'Name': 'BucketName', 'Value': bucket['Name']}],
+                    days * 24 * 3600,
+                    'Average'
+                )
+                for i, bucket in enumerate(non_empty_buckets)
+            ]
+            metric_values = self._get_metric_values(queries, start_time, end_time)
+
+            for i, bucket in enumerate(non_empty_buckets):
+                if not metric_values.get(f'm{i}'):
+                    unused_buckets.append({
+                        'BucketName': bucket['Name'],
+                        'CreationDate': bucket['CreationDate'],
+                        'Reason': 'No recent access'
+                    })
+
             return unused_buckets
         except Exception as e:
             print(f"Error checking S3 buckets: {str(e)}")